@@ -1,14 +1,97 @@
 import sys
 import csv
 import re
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
-def write_file_line(f, text):
-    f.write(text + "\r\n")
+NONALNUM_RE = re.compile(r'\W+')
+# ASCII equivalent of NONALNUM_RE for str.translate: drop everything but letters, digits, and _
+ASCII_STRIP_TABLE = {i: None for i in range(128) if not (chr(i).isalnum() or chr(i) == '_')}
+
+# Page skeletons, converted to CRLF line endings once at load time
+ACTIVITY_TEMPLATE = """---
+layout: activity
+permalink: {permalink}
+title: "{coursenum}: {coursetitle} - {title}"
+excerpt: "{coursenum}: {coursetitle} - {title}"
+
+info:
+  goals:
+    - xxx
+
+  models:
+    - model: |
+        xxx
+      title: xxx
+      questions:
+        - xxx
+
+  additional_reading:
+    - link: xxx
+      title: xxx
+
+  additional_practice:
+    - link: xxx
+      title: xxx
+
+tags:
+  - xxx
+
+---
+
+""".replace("\n", "\r\n")
+
+# Assignments, labs, and projects all share the assignment layout
+ASSIGNMENT_TEMPLATE = """---
+layout: assignment
+permalink: {permalink}
+title: "{coursenum}: {coursetitle} - {title}"
+excerpt: "{coursenum}: {coursetitle} - {title}"
+
+info:
+  coursenum: {coursenum}
+  points: {points}
+  goals:
+    - xxx
+
+  rubric:
+  - weight: 100
+    description: xxx
+    preemerging: xxx
+    beginning: xxx
+    progressing: xxx
+    proficient: xxx
+
+  readings:
+    - rlink: xxx
+      rtitle: xxx
+
+  questions:
+    - xxx
+
+tags:
+  - xxx
+
+---
+
+""".replace("\n", "\r\n")
+
+# write the whole page with a single call; binary mode skips the text layer's newline and encoding passes
+def write_page(fname, text):
+    f = open(fname, "wb")
+    f.write(text.encode("utf-8"))
+    f.close()
 
 # basefolder: Activities, rootname: activity
+# cached since rows often repeat the same link (i.e., "Handed Out" and "Due" entries)
+@lru_cache(maxsize=1024)
 def get_file_name_from_link(link, basefolder, rootname):
-    fname = link.replace("./" + basefolder + "/", "").replace(" ", "").lower()
-    fname = re.sub(r'\W+', '', fname) # remove non alphanumeric characters
+    fname = link.replace("./" + basefolder + "/", "").lower()
+    # remove non alphanumeric characters (including spaces)
+    if fname.isascii():
+        fname = fname.translate(ASCII_STRIP_TABLE)
+    else:
+        fname = NONALNUM_RE.sub('', fname)
     fname = rootname + "-" + fname + ".md"
     
     return fname
@@ -26,162 +109,30 @@ def get_deliverable_page_title(title):
     
     return title
 
-def generate_activity_page(title, link, coursenum, coursetitle):
-    fname = get_file_name_from_link(link, "Activities", "activity")
-    f = open(fname, "w")
-    
-    write_file_line(f, "---")
-    write_file_line(f, "layout: activity")
-    write_file_line(f, "permalink: " + link.replace("./Activities", "/Activities"))
-    write_file_line(f, "title: \"" + coursenum + ": " + coursetitle + " - " + title + "\"")
-    write_file_line(f, "excerpt: \"" + coursenum + ": " + coursetitle + " - " + title + "\"")
-    write_file_line(f, "")
-    write_file_line(f, "info:")
-    write_file_line(f, "  goals:")
-    write_file_line(f, "    - xxx")
-    write_file_line(f, "")
-    write_file_line(f, "  models:")
-    write_file_line(f, "    - model: |")
-    write_file_line(f, "        xxx")
-    write_file_line(f, "      title: xxx")
-    write_file_line(f, "      questions:")
-    write_file_line(f, "        - xxx")
-    write_file_line(f, "")
-    write_file_line(f, "  additional_reading:")
-    write_file_line(f, "    - link: xxx")
-    write_file_line(f, "      title: xxx")
-    write_file_line(f, "")
-    write_file_line(f, "  additional_practice:")
-    write_file_line(f, "    - link: xxx")
-    write_file_line(f, "      title: xxx")
-    write_file_line(f, "")
-    write_file_line(f, "tags:")
-    write_file_line(f, "  - xxx")
-    write_file_line(f, "")
-    write_file_line(f, "---")
-    write_file_line(f, "")
+def generate_activity_page(fname, title, link, coursenum, coursetitle):
+    text = ACTIVITY_TEMPLATE.format(permalink=link.replace("./Activities", "/Activities"), coursenum=coursenum, coursetitle=coursetitle, title=title)
+    write_page(fname, text)
     
-    f.close()
-    
-def generate_assignment_page(title, link, points, coursenum, coursetitle):
-    fname = get_file_name_from_link(link, "Assignments", "assignment")
-    f = open(fname, "w")
-    
-    write_file_line(f, "---")
-    write_file_line(f, "layout: assignment")
-    write_file_line(f, "permalink: " + link.replace("./Assignments", "/Assignments"))
-    write_file_line(f, "title: \"" + coursenum + ": " + coursetitle + " - " + get_deliverable_page_title(title) + "\"")
-    write_file_line(f, "excerpt: \"" + coursenum + ": " + coursetitle + " - " + get_deliverable_page_title(title) + "\"")
-    write_file_line(f, "")
-    write_file_line(f, "info:")
-    write_file_line(f, "  coursenum: " + coursenum)
-    write_file_line(f, "  points: " + points)
-    write_file_line(f, "  goals:")
-    write_file_line(f, "    - xxx")
-    write_file_line(f, "")
-    write_file_line(f, "  rubric:")
-    write_file_line(f, "  - weight: 100")
-    write_file_line(f, "    description: xxx")
-    write_file_line(f, "    preemerging: xxx")
-    write_file_line(f, "    beginning: xxx")
-    write_file_line(f, "    progressing: xxx")
-    write_file_line(f, "    proficient: xxx")
-    write_file_line(f, "")
-    write_file_line(f, "  readings:")
-    write_file_line(f, "    - rlink: xxx")
-    write_file_line(f, "      rtitle: xxx")
-    write_file_line(f, "")
-    write_file_line(f, "  questions:")
-    write_file_line(f, "    - xxx")
-    write_file_line(f, "")
-    write_file_line(f, "tags:")
-    write_file_line(f, "  - xxx")
-    write_file_line(f, "")
-    write_file_line(f, "---")
-    write_file_line(f, "")
-    
-    f.close()
+# kind (the folder name in the link) -> root name used for the generated file
+KINDS = {"Assignments": "assignment", "Labs": "lab", "Project": "project"}
 
-def generate_project_page(title, link, points, coursenum, coursetitle):
-    fname = get_file_name_from_link(link, "Project", "project")
-    f = open(fname, "w")
-    
-    write_file_line(f, "---")
-    write_file_line(f, "layout: assignment")
-    write_file_line(f, "permalink: " + link.replace("./Project", "/Project"))
-    write_file_line(f, "title: \"" + coursenum + ": " + coursetitle + " - " + get_deliverable_page_title(title) + "\"")
-    write_file_line(f, "excerpt: \"" + coursenum + ": " + coursetitle + " - " + get_deliverable_page_title(title) + "\"")
-    write_file_line(f, "")
-    write_file_line(f, "info:")
-    write_file_line(f, "  coursenum: " + coursenum)
-    write_file_line(f, "  points: " + points)
-    write_file_line(f, "  goals:")
-    write_file_line(f, "    - xxx")
-    write_file_line(f, "")
-    write_file_line(f, "  rubric:")
-    write_file_line(f, "  - weight: 100")
-    write_file_line(f, "    description: xxx")
-    write_file_line(f, "    preemerging: xxx")
-    write_file_line(f, "    beginning: xxx")
-    write_file_line(f, "    progressing: xxx")
-    write_file_line(f, "    proficient: xxx")
-    write_file_line(f, "")
-    write_file_line(f, "  readings:")
-    write_file_line(f, "    - rlink: xxx")
-    write_file_line(f, "      rtitle: xxx")
-    write_file_line(f, "")
-    write_file_line(f, "  questions:")
-    write_file_line(f, "    - xxx")
-    write_file_line(f, "")
-    write_file_line(f, "tags:")
-    write_file_line(f, "  - xxx")
-    write_file_line(f, "")
-    write_file_line(f, "---")
-    write_file_line(f, "")
-    
-    f.close()   
-    
-def generate_lab_page(title, link, points, coursenum, coursetitle):
-    fname = get_file_name_from_link(link, "Labs", "lab")
-    f = open(fname, "w")
-    
-    write_file_line(f, "---")
-    write_file_line(f, "layout: assignment")
-    write_file_line(f, "permalink: " + link.replace("./Labs", "/Labs"))
-    write_file_line(f, "title: \"" + coursenum + ": " + coursetitle + " - " + get_deliverable_page_title(title) + "\"")
-    write_file_line(f, "excerpt: \"" + coursenum + ": " + coursetitle + " - " + get_deliverable_page_title(title) + "\"")
-    write_file_line(f, "")
-    write_file_line(f, "info:")
-    write_file_line(f, "  coursenum: " + coursenum)
-    write_file_line(f, "  points: " + points)
-    write_file_line(f, "  goals:")
-    write_file_line(f, "    - xxx")
-    write_file_line(f, "")
-    write_file_line(f, "  rubric:")
-    write_file_line(f, "  - weight: 100")
-    write_file_line(f, "    description: xxx")
-    write_file_line(f, "    preemerging: xxx")
-    write_file_line(f, "    beginning: xxx")
-    write_file_line(f, "    progressing: xxx")
-    write_file_line(f, "    proficient: xxx")
-    write_file_line(f, "")
-    write_file_line(f, "  readings:")
-    write_file_line(f, "    - rlink: xxx")
-    write_file_line(f, "      rtitle: xxx")
-    write_file_line(f, "")
-    write_file_line(f, "  questions:")
-    write_file_line(f, "    - xxx")
-    write_file_line(f, "")
-    write_file_line(f, "tags:")
-    write_file_line(f, "  - xxx")
-    write_file_line(f, "")
-    write_file_line(f, "---")
-    write_file_line(f, "")
-    
-    f.close()  
-    
-def strip(x):
-    return x.strip()
+# find the kind of a deliverable link, i.e., ./Assignments/Name -> Assignments
+def get_link_kind(link):
+    if link.startswith("./"):
+        kind = link[2:].split("/", 1)[0]
+        if kind in KINDS:
+            return kind
+    
+    # links not of the form ./Kind/... fall back to a substring search
+    for kind in KINDS:
+        if kind in link:
+            return kind
+            
+    return None
+
+def generate_submission_page(kind, fname, title, link, points, coursenum, coursetitle):
+    text = ASSIGNMENT_TEMPLATE.format(permalink=link.replace("./" + kind, "/" + kind), coursenum=coursenum, coursetitle=coursetitle, title=get_deliverable_page_title(title), points=points)
+    write_page(fname, text)
     
 if len(sys.argv) < 4:
     print("Usage: <csv filename> <course number> \"<course title>\"")
@@ -191,17 +142,56 @@ fname = sys.argv[1]
 coursenum = sys.argv[2]
 coursetitle = sys.argv[3]
 
-csvfile = open(fname , 'r')
+csvfile = open(fname, 'r', newline='', buffering=1048576) # newline='' per the csv module docs; read the whole table in as few calls as possible
 
-csvreader = csv.DictReader(csvfile,delimiter=',')
-   
-for row in csvreader:
-    #print(row)  
-    
-    if 'Activities' in row['Link']:
-        generate_activity_page(row['Title'], row['Link'], coursenum, coursetitle)
+csvreader = csv.reader(csvfile,delimiter=',')
+
+# map column names to positions once from the header row instead of building a dict per row
+header = next(csvreader, None)
+if header is None:
+    sys.exit(0)
+col = {name: idx for idx, name in enumerate(header)}
+TITLE = col['Title']
+LINK = col['Link']
+DELIVERABLE_COLS = [(col["dtitle" + str(i)], col["dlink" + str(i)], col["dpoints" + str(i)]) for i in range(1, 4)]
+
+# pages already written this run; the same Activities link or the same Due deliverable can appear in more than one row
+# the first such row wins (previously each repeat rewrote the page, so the last row's title and points were kept)
+seen = set()
+
+# each page is a separate file, so they can be written concurrently
+futures = []
+with ThreadPoolExecutor(max_workers=16) as executor:
+    for row in csvreader:
+        #print(row)  
         
-    for name, generator in [("Assignments", generate_assignment_page), ("Labs", generate_lab_page), ("Project", generate_project_page)]:
-        for i in range(3):            
-            if name in row['dlink' + str(i+1)] and "Due" in row['dtitle' + str(i+1)]:
-                generator(row['dtitle' + str(i+1)], row['dlink' + str(i+1)], row['dpoints' + str(i+1)], coursenum, coursetitle)
\ No newline at end of file
+        if len(row) == 0: # blank line
+            continue
+        
+        link = row[LINK]
+        if 'Activities' in link:
+            pagefname = get_file_name_from_link(link, "Activities", "activity")
+            if not (pagefname in seen):
+                seen.add(pagefname)
+                futures.append(executor.submit(generate_activity_page, pagefname, row[TITLE], link, coursenum, coursetitle))
+            
+        for titlecol, linkcol, pointscol in DELIVERABLE_COLS:
+            dtitle = row[titlecol]
+            if not ("Due" in dtitle):
+                continue
+                
+            dlink = row[linkcol]
+            kind = get_link_kind(dlink)
+            if kind is None:
+                continue
+                
+            pagefname = get_file_name_from_link(dlink, kind, KINDS[kind])
+            if pagefname in seen:
+                continue
+                
+            seen.add(pagefname)
+            futures.append(executor.submit(generate_submission_page, kind, pagefname, dtitle, dlink, row[pointscol], coursenum, coursetitle))
+
+    # wait for the writes to finish, raising any error they hit
+    for future in futures:
+        future.result()
@@ -1,98 +1,80 @@
 import sys
 import csv
 
-def strip(x):
-    return x.strip()
-    
 if len(sys.argv) < 2:
     print("Usage: <csv filename>")
     sys.exit(-1)
     
 fname = sys.argv[1]
 
-csvfile = open(fname , 'r')
+csvfile = open(fname, 'r', newline='', buffering=1048576) # newline='' per the csv module docs; read the whole table in as few calls as possible
+
+csvreader = csv.reader(csvfile,delimiter=',')
+
+# map column names to positions once from the header row instead of building a dict per row
+headerrow = next(csvreader, None)
+if headerrow is None:
+    sys.exit(0)
+col = {name: idx for idx, name in enumerate(headerrow)}
+WEEK = col['Week']
+DAY = col['Day']
+TITLE = col['Title']
+LINK = col['Link']
 
-csvreader = csv.DictReader(csvfile,delimiter=',')
+# column positions for the three deliverable and five reading slots
+DELIVERABLE_COLS = [(col["dtitle" + str(i)], col["dlink" + str(i)], col["dpoints" + str(i)], col["dtype" + str(i)], col["drubric" + str(i)]) for i in range(1, 4)]
+READING_COLS = [(col["rtitle" + str(i)], col["rlink" + str(i)]) for i in range(1, 6)]
+
+# collect the output lines and write them all at once at the end
+out = []
    
 for row in csvreader:
     #print(row)  
     
-    print("  - week: \"{}\"".format(row['Week']))
-    print("    date: \"{}\"".format(row['Day']))
-    print("    title: \"{}\"".format(row['Title']))
-    if len(strip(row['Link'])) > 0:
-        print("    link: \"{}\"".format(row['Link']))
+    if len(row) == 0: # blank line
+        continue
     
-    if len(strip(row['dtitle1'])) > 0:
-        print("    deliverables:")
-        print("      - dtitle: \"{}\"".format(row['dtitle1']))
-        if len(strip(row['dlink1'])) > 0:
-            print("        dlink: \"{}\"".format(row['dlink1']))
-        else:
-            print("        dlink: false")        
-        print("        points: {}".format(row['dpoints1']))
-        if len(strip(row['dtype1'])) > 0:
-            print("        submission_types: \"{}\"".format(row['dtype1']))
-        if len(strip(row['drubric1'])) > 0:
-            print("        rubricpath: \"{}\"".format(row['drubric1']))
-            
-    if len(strip(row['dtitle2'])) > 0:
-        print("      - dtitle: \"{}\"".format(row['dtitle2']))
-        if len(strip(row['dlink2'])) > 0:
-            print("        dlink: \"{}\"".format(row['dlink2']))
-        else:
-            print("        dlink: false")                
-        print("        points: {}".format(row['dpoints2']))
-        if len(strip(row['dtype2'])) > 0:
-            print("        submission_types: \"{}\"".format(row['dtype2']))
-        if len(strip(row['drubric2'])) > 0:
-            print("        rubricpath: \"{}\"".format(row['drubric2']))            
-
-    if len(strip(row['dtitle3'])) > 0:
-        print("      - dtitle: \"{}\"".format(row['dtitle3']))
-        if len(strip(row['dlink3'])) > 0:
-            print("        dlink: \"{}\"".format(row['dlink3']))
-        else:
-            print("        dlink: false")                
-        print("        points: {}".format(row['dpoints3']))
-        if len(strip(row['dtype3'])) > 0:
-            print("        submission_types: \"{}\"".format(row['dtype3'])) 
-        if len(strip(row['drubric3'])) > 0:
-            print("        rubricpath: \"{}\"".format(row['drubric3']))            
-
-    if len(strip(row['rtitle1'])) > 0:
-        print("    readings:")
-        print("      - rtitle: \"{}\"".format(row['rtitle1']))
-        if len(strip(row['rlink1'])) > 0:
-            print("        rlink: \"{}\"".format(row['rlink1']))
-        else:
-            print("        rlink: false")
-
-    if len(strip(row['rtitle2'])) > 0:
-        print("      - rtitle: \"{}\"".format(row['rtitle2']))
-        if len(strip(row['rlink2'])) > 0:
-            print("        rlink: \"{}\"".format(row['rlink2']))
-        else:
-            print("        rlink: false")
-
+    out.append("  - week: \"{}\"".format(row[WEEK]))
+    out.append("    date: \"{}\"".format(row[DAY]))
+    out.append("    title: \"{}\"".format(row[TITLE]))
+    link = row[LINK]
+    if link.strip():
+        out.append("    link: \"{}\"".format(link))
+    
+    started = False
+    for titlecol, linkcol, pointscol, typecol, rubriccol in DELIVERABLE_COLS:
+        dtitle = row[titlecol]
+        if dtitle.strip():
+            if not started:
+                out.append("    deliverables:")
+                started = True
+            out.append("      - dtitle: \"{}\"".format(dtitle))
+            dlink = row[linkcol]
+            if dlink.strip():
+                out.append("        dlink: \"{}\"".format(dlink))
+            else:
+                out.append("        dlink: false")
+            out.append("        points: {}".format(row[pointscol]))
+            dtype = row[typecol]
+            if dtype.strip():
+                out.append("        submission_types: \"{}\"".format(dtype))
+            drubric = row[rubriccol]
+            if drubric.strip():
+                out.append("        rubricpath: \"{}\"".format(drubric))
 
-    if len(strip(row['rtitle3'])) > 0:
-        print("      - rtitle: \"{}\"".format(row['rtitle3']))
-        if len(strip(row['rlink3'])) > 0:
-            print("        rlink: \"{}\"".format(row['rlink3']))
-        else:
-            print("        rlink: false")
-        
-    if len(strip(row['rtitle4'])) > 0:
-        print("      - rtitle: \"{}\"".format(row['rtitle4']))
-        if len(strip(row['rlink4'])) > 0:
-            print("        rlink: \"{}\"".format(row['rlink4']))
-        else:
-            print("        rlink: false")
+    started = False
+    for titlecol, linkcol in READING_COLS:
+        rtitle = row[titlecol]
+        if rtitle.strip():
+            if not started:
+                out.append("    readings:")
+                started = True
+            out.append("      - rtitle: \"{}\"".format(rtitle))
+            rlink = row[linkcol]
+            if rlink.strip():
+                out.append("        rlink: \"{}\"".format(rlink))
+            else:
+                out.append("        rlink: false")
 
-    if len(strip(row['rtitle5'])) > 0:
-        print("      - rtitle: \"{}\"".format(row['rtitle5']))
-        if len(strip(row['rlink5'])) > 0:
-            print("        rlink: \"{}\"".format(row['rlink5']))
-        else:
-            print("        rlink: false")
+if len(out) > 0:
+    sys.stdout.write("\n".join(out) + "\n")
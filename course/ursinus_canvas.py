@@ -12,10 +12,11 @@ from datetime import datetime, timedelta
 import threading
 import time
 import random
-from urllib import request, parse
 import requests
-import json
+from requests.adapters import HTTPAdapter
 import pytz
+import os
+from functools import lru_cache
 
 # https://github.com/ucfopen/canvasapi/blob/develop/canvasapi/course.py
 # https://github.com/ucfopen/canvasapi/blob/develop/canvasapi/canvas.py
@@ -30,18 +31,39 @@ API_URL = "https://ursinus.instructure.com/"
 # Generate key at API_URL + profile/settings
 # Obtain User ID from API_URL + /api/v1/users/self
 
-CANVAS_TIME_ZONE = "America/New_York"
-LOCALTIME = pytz.timezone(CANVAS_TIME_ZONE)
+CANVAS_TIME_ZONE = "America/New_York" # LOCALTIME is built from this once the options are parsed
 DUE_TIME_DST = "T035959Z" 
 DUE_TIME_ST = "T045959Z" 
 DUE_DATE_OFFSET = 1 # add 1 day to make things due the next morning per the due time above if GMT is after midnight
 DUE_DATE_FORMAT = "%Y%m%dT%H%M%SZ"
 
+# Rubric rating levels: (rating description, key in the rubric markdown, fraction of the criterion's points)
+RUBRIC_RATINGS = [("Pre-Emerging", "preemerging", 0.25), ("Beginning", "beginning", 0.50), ("Progressing", "progressing", 0.85), ("Proficient", "proficient", 1.00)]
+
+CANVAS_PAGE_SIZE = 100 # results per page for list requests (the Canvas maximum), rather than the default of 10
+
+RATE_LIMIT_BACKOFF = 2 # seconds to wait after Canvas first refuses a request; doubles on each retry
+RATE_LIMIT_BACKOFF_MAX = 60 # longest single wait in seconds
+RATE_LIMIT_MAX_ATTEMPTS = 8 # rubric creation gives up after this many rate-limit refusals
+CANVAS_MAX_CONCURRENT_REQUESTS = 8 # most deletes/rubric creations allowed in flight at once across all child threads
+RATE_LIMIT_LOW = 100 # throttle direct requests once Canvas reports less than this much of its request quota (the bucket holds 700)
+
 TABS_TO_HIDE = ["Outcomes", "Collaborations", "Files", "Pages", "Conferences", "BigBlueButton", "Chat", "New Analytics", "Panopto Video", "Zoom"] # which navigation pane items to hide if they are visible
 TABS_TO_SHOW = ["Assignments", "Discussions", "Grades", "People", "Syllabus", "Modules", "Grizzly Gateway", "SPTQ", "Attendance", "Rubrics", "Quizzes", "Announcements" ] # which navigation pane items to force show if they are already hidden
 
 child_threads = []
 
+# One pooled session for direct Canvas API calls so that connections (and their TLS handshakes) are reused across requests and threads
+canvas_session = requests.Session()
+canvas_session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+# Most recent X-Rate-Limit-Remaining reported by Canvas, shared by the request threads
+rate_limit_remaining = None
+rate_limit_lock = threading.Lock()
+
+# Child threads are started one per item, so this bounds how many of them talk to Canvas at the same time
+canvas_request_slots = threading.BoundedSemaphore(CANVAS_MAX_CONCURRENT_REQUESTS)
+
 skipdiscussions = False
 skipassignments = False
 skipofficehours = True
@@ -57,7 +79,12 @@ def get_local_time(dt):
         else:
             dt = parseDate(dt)
         
-    localized_dt = LOCALTIME.localize(dt)
+    return get_due_time_for_date(dt.year, dt.month, dt.day)
+    
+# DST status only changes with the date (due times are always at the same time of day), so localize once per calendar day
+@lru_cache(maxsize=512)
+def get_due_time_for_date(year, month, day):
+    localized_dt = LOCALTIME.localize(datetime(year, month, day))
     isDST = bool(localized_dt.dst())
     
     if isDST:
@@ -65,17 +92,29 @@ def get_local_time(dt):
     else:
         return DUE_TIME_ST
     
-def canvas_http_request(endpoint, inputdict=None, method="GET"):
+# Only slow down when Canvas says the quota is nearly used up, and more so the closer it is to empty
+def ratelimitthrottle():
+    with rate_limit_lock:
+        remaining = rate_limit_remaining
+    if not (remaining is None) and remaining < RATE_LIMIT_LOW:
+        time.sleep(1 + (RATE_LIMIT_LOW - remaining) / 20)
+    
+# Pass throttle=False when the caller has already called ratelimitthrottle (i.e., before taking a canvas_request_slots slot)
+def canvas_http_request(endpoint, inputdict=None, method="GET", throttle=True):
+    global rate_limit_remaining
+    
     header = {"Authorization": "Bearer %s" % API_KEY}
-
-    if not (inputdict is None):
-        data = parse.urlencode(inputdict).encode()
-        header['Content-Type'] = 'application/x-www-form-urlencoded'
-    else:
-        data = None
     
-    req =  request.Request(rchop(API_URL, '/') + endpoint, data=data, headers=header, method=method) 
-    resp = request.urlopen(req)   
+    if throttle:
+        ratelimitthrottle()
+    
+    resp = canvas_session.request(method, rchop(API_URL, '/') + endpoint, json=inputdict, headers=header) # sent as a JSON body so nested dicts like rubric criteria survive intact
+    
+    if 'X-Rate-Limit-Remaining' in resp.headers:
+        with rate_limit_lock:
+            rate_limit_remaining = float(resp.headers['X-Rate-Limit-Remaining'])
+    
+    resp.raise_for_status()
     return resp
     
 def makelink(base, url):
@@ -114,16 +153,31 @@ def stripnobool(val):
     
     return result.strip()
 
+# Returns the stripped link stored under key, or None if it is missing, empty, or false
+def getlink(d, key):
+    link = d.get(key)
+    if link is None or link is False or link == "":
+        return None
+    
+    stripped = str(link).strip()
+    if len(stripped) == 0 or stripped.lower() == "false":
+        return None
+    
+    return stripped
+
+# Exponential backoff with jitter for retrying a request that Canvas refused (i.e., rate limit exceeded)
+def ratelimitsleep(attempt):
+    sleeptime = min(RATE_LIMIT_BACKOFF * (2 ** attempt), RATE_LIMIT_BACKOFF_MAX)
+    time.sleep(sleeptime + random.uniform(0, 1)) # jitter so that waiting threads do not retry in lockstep
+
 def dodelete(item, dosleep=True):
     repeat = True
+    attempt = 0
     
     while repeat:
-        if dosleep: # for rate limiting
-            sleeptime = random.randint(5, 20)
-            time.sleep(sleeptime)
-            
         try:
-            item.delete()
+            with canvas_request_slots:
+                item.delete()
             printlog("Delete: Successful")
             repeat = False
         except exceptions.ResourceDoesNotExist:
@@ -141,9 +195,13 @@ def dodelete(item, dosleep=True):
         except Exception as ex:
             print("Deleting: Unknown Error - " + repr(ex))
             repeat = False
+            
+        if repeat and dosleep: # for rate limiting, only wait once Canvas has refused the request
+            ratelimitsleep(attempt)
+            attempt = attempt + 1
              
 def delete_all_events(canvas, coursecontext):
-    events = canvas.get_calendar_events(all_events = True, context_codes = [coursecontext])
+    events = canvas.get_calendar_events(all_events = True, context_codes = [coursecontext], per_page = CANVAS_PAGE_SIZE)
     
     for event in events:
         t = threading.Thread(target=dodelete, args=(event,))
@@ -154,7 +212,7 @@ def delete_all_assignments(course):
     if skipassignments:
         return
         
-    assignments = course.get_assignments()
+    assignments = course.get_assignments(per_page=CANVAS_PAGE_SIZE)
 
     for assignment in assignments:        
         t = threading.Thread(target=dodelete, args=(assignment,))
@@ -163,35 +221,42 @@ def delete_all_assignments(course):
 
 # DELETE /api/v1/courses/:course_id/rubrics/:id
 def delete_rubric(rubric, dosleep=True):
-    if dosleep: # for rate limiting
-        sleeptime = random.randint(5, 20)
-        time.sleep(sleeptime)
-        
-    rubric = None
-    try:
-        rubric = canvas_http_request('/api/v1/courses/' + str(courseid) + '/rubrics/' + str(rubric.id), method="DELETE")
-    except:
-        print("Error Deleting Rubric")
-        
-    return rubric
+    attempt = 0
+    
+    while True:
+        try:
+            ratelimitthrottle() # wait for quota before taking a slot so that a throttled thread does not hold it while sleeping
+            with canvas_request_slots:
+                return canvas_http_request('/api/v1/courses/' + str(courseid) + '/rubrics/' + str(rubric.id), method="DELETE", throttle=False)
+        except requests.HTTPError as ex:
+            if ex.response.status_code == 403 and dosleep: # for rate limiting, only wait once Canvas has refused the request
+                print("Deleting Rubric: Forbidden - it is possible that the rate limit is exceeded")
+                ratelimitsleep(attempt)
+                attempt = attempt + 1
+            else:
+                print("Error Deleting Rubric: " + repr(ex))
+                return None
+        except Exception as ex:
+            print("Error Deleting Rubric: " + repr(ex))
+            return None
     
 def delete_all_rubrics(course):
     if skipassignments:
         return
         
-    rubrics = course.get_rubrics()
+    rubrics = course.get_rubrics(per_page=CANVAS_PAGE_SIZE)
     for rubric in rubrics:        
         t = threading.Thread(target=delete_rubric, args=(rubric,))
         child_threads.append(t)
         t.start()  
         
 def delete_all_modules(course):
-    modules = course.get_modules()
+    modules = course.get_modules(per_page=CANVAS_PAGE_SIZE)
     
     itemthreads = []
     
     for module in modules:
-        items = module.get_module_items()
+        items = module.get_module_items(per_page=CANVAS_PAGE_SIZE)
         
         for item in items:
             t = threading.Thread(target=dodelete, args=(item,))
@@ -207,7 +272,7 @@ def delete_all_modules(course):
         t.start()   
 
 def delete_all_quizzes(course):
-    quizzes = course.get_quizzes()
+    quizzes = course.get_quizzes(per_page=CANVAS_PAGE_SIZE)
         
     for quiz in quizzes:
         t = threading.Thread(target=dodelete, args=(quiz,))
@@ -218,7 +283,7 @@ def delete_all_assignment_groups(course):
     if skipassignments:
         return
         
-    groups = course.get_assignment_groups()
+    groups = course.get_assignment_groups(per_page=CANVAS_PAGE_SIZE)
     
     for group in groups:
         t = threading.Thread(target=dodelete, args=(group,))
@@ -229,11 +294,11 @@ def delete_all_discussion_topics(course):
     if skipdiscussions:
         return
         
-    topics = course.get_discussion_topics()
+    topics = course.get_discussion_topics(per_page=CANVAS_PAGE_SIZE)
     
     itemthreads = []
     for topic in topics:
-        entries = topic.get_topic_entries()
+        entries = topic.get_topic_entries(per_page=CANVAS_PAGE_SIZE)
         
         for entry in entries:
             t = threading.Thread(target=dodelete, args=(entry,))
@@ -248,11 +313,12 @@ def delete_all_discussion_topics(course):
         child_threads.append(t)
         t.start() 
 
-def delete_assignment_group_by_name(course, name):
-    groups = course.get_assignment_groups()
+# Delete every assignment group whose name is in names, listing the groups only once
+def delete_assignment_groups_by_name(course, names):
+    groups = course.get_assignment_groups(per_page=CANVAS_PAGE_SIZE)
     
     for group in groups:
-        if group.name == name:
+        if group.name in names:
             t = threading.Thread(target=dodelete, args=(group,))
             child_threads.append(t)
             t.start()         
@@ -323,19 +389,17 @@ def create_quiz_content_migration(course, quiz_path, sleep_time=5):
     
     # now actually upload the file to the url given by the response to the module creation
     upload_url = migration.pre_attachment['upload_url']
-    upload_file = open(quiz_path, 'rb')
-    requests.post(upload_url, files={'file': upload_file}) # zip of qti
+    with open(quiz_path, 'rb') as upload_file:
+        canvas_session.post(upload_url, files={'file': upload_file}) # zip of qti
     
-    # wait for upload 
+    # wait for upload; the progress url does not change, so look it up once and poll it over the pooled session
+    progress_url = migration.get_progress().url
+    header = {"Authorization": "Bearer %s" % API_KEY}
     uploaddone = False
     while not uploaddone:
-        progress = migration.get_progress()
-        progress_url = progress.url
         print("Waiting for upload of " + quiz_path + " to complete, check progress at: " + progress_url)
-        header = {"Authorization": "Bearer %s" % API_KEY}
-        resp = requests.get(progress_url, headers=header)
-        body = resp.text
-        bodyjson = json.loads(body)
+        resp = canvas_session.get(progress_url, headers=header)
+        bodyjson = resp.json()
         status = bodyjson['workflow_state'] 
         completion = bodyjson['completion']
         if status != 'queued':
@@ -374,57 +438,22 @@ def getDayCodeNum(daycode):
     else:
         return -1
 
-def getDayNum(dayidx, M, T, W, R, F, S, U):
-    result = 0
-    
-    if M:
-        dayidx = dayidx - 1
-        
-        if dayidx == -1:
-            result = 0
-    
-    if T:
-        dayidx = dayidx - 1
-        
-        if dayidx == -1:
-            result = 1
-
-    if W:
-        dayidx = dayidx - 1
-        
-        if dayidx == -1:
-            result = 2
-
-    if R:
-        dayidx = dayidx - 1
-        
-        if dayidx == -1:
-            result = 3
-
-    if F:
-        dayidx = dayidx - 1
-        
-        if dayidx == -1:
-            result = 4
-
-    if S:
-        dayidx = dayidx - 1
-        
-        if dayidx == -1:
-            result = 5
-
-    if U:
-        dayidx = dayidx - 1
-        
-        if dayidx == -1:
-            result = 6
-
-    return result
+# weekday numbers (Monday = 0) of each class meeting, so that a class meeting index can be looked up directly
+def getMeetingDays(M, T, W, R, F, S, U):
+    return tuple(i for i, flag in enumerate([M, T, W, R, F, S, U]) if flag)
     
 def getTimeString(t):   
     return t.strftime('%H%M%S')    
     
+# the fixed-width numeric formats used throughout are sliced directly when every field is ASCII digits; anything else falls back to strptime
 def parseDate(dt, fmt='%Y/%m/%d'):
+    if fmt == '%Y/%m/%d' and len(dt) == 10 and dt.isascii() and dt[4] == '/' and dt[7] == '/' and dt[0:4].isdigit() and dt[5:7].isdigit() and dt[8:10].isdigit():
+        return datetime(int(dt[0:4]), int(dt[5:7]), int(dt[8:10]))
+    elif fmt == '%Y%m%d' and len(dt) == 8 and dt.isascii() and dt.isdigit():
+        return datetime(int(dt[0:4]), int(dt[4:6]), int(dt[6:8]))
+    elif fmt == DUE_DATE_FORMAT and len(dt) == 16 and dt.isascii() and dt[8] == 'T' and dt[15] == 'Z' and dt[0:8].isdigit() and dt[9:15].isdigit():
+        return datetime(int(dt[0:4]), int(dt[4:6]), int(dt[6:8]), int(dt[9:11]), int(dt[11:13]), int(dt[13:15]))
+    
     return datetime.strptime(dt, fmt)
     
 def parseTime(t):
@@ -442,14 +471,15 @@ def addweeks(dt, n):
 def getDateString(dt, fmt='%Y%m%d'):
     return dt.strftime(fmt)    
     
-def getCourseDate(startdate, weeknum, dayidx, M, T, W, R, F, S, U, tostring=True):
-    dt = parseDate(startdate)
+# The date of a schedule entry given its week and class meeting index, from the parsed start date and the meeting days from getMeetingDays
+# out-of-range meeting indices fall back to the start of the week
+def getCourseDateFromMeetingDays(startdt, weeknum, dayidx, meetingdays, tostring=True):
     weeknum = int(weeknum)
     dayidx = int(dayidx)
     
-    dt = addweeks(dt, weeknum)
-    daynum = getDayNum(dayidx, M, T, W, R, F, S, U)
-    dt = adddays(dt, daynum)
+    dt = addweeks(startdt, weeknum)
+    if dayidx >= 0 and dayidx < len(meetingdays):
+        dt = adddays(dt, meetingdays[dayidx])
     
     if tostring:
         return getDateString(dt)
@@ -458,7 +488,11 @@ def getCourseDate(startdate, weeknum, dayidx, M, T, W, R, F, S, U, tostring=True
     
 # Assumes the quiz has already been added to the shell with a name that matches the parameter
 def find_quiz_by_title(course, quiz_name):
-    quizzes = course.get_quizzes()
+    # filter server-side when Canvas will accept the search term (at least 2 characters); the exact title match below still applies
+    if len(quiz_name) >= 2:
+        quizzes = course.get_quizzes(search_term=quiz_name, per_page=CANVAS_PAGE_SIZE)
+    else:
+        quizzes = course.get_quizzes(per_page=CANVAS_PAGE_SIZE)
         
     for quiz in quizzes:
         if quiz.title == quiz_name:
@@ -482,12 +516,67 @@ def edit_quiz(quiz, inputdict):
 
     return newquiz
     
+# Read and parse a rubric markdown file
+def load_rubric_markdown(rubricpath):
+    rubricf = open(rubricpath, 'r')
+    rubricmdcontents = rubricf.read()
+    rubricf.close()
+    
+    rubricpost = frontmatter.loads(rubricmdcontents)
+    return rubricpost.to_dict()
+    
+# The criteria of a rubric markdown file as (description, weight, (rating long descriptions in RUBRIC_RATINGS order)) tuples, or None if it has no rubric
+# Many deliverables share a rubric file and only the point values depend on the assignment, so this is cached; mtime is only part of the cache key so that an edited file is parsed again
+@lru_cache(maxsize=64)
+def load_rubric_criteria(rubricpath, mtime):
+    rubricpostdict = load_rubric_markdown(rubricpath)
+    if not ("info" in rubricpostdict and "rubric" in rubricpostdict['info']):
+        return None
+        
+    return tuple((criteria['description'], float(criteria['weight']), tuple(criteria[ratingkey] for (ratingname, ratingkey, ratingweight) in RUBRIC_RATINGS)) for criteria in rubricpostdict['info']['rubric'])
+    
 # Create a Rubric
 # https://canvas.instructure.com/doc/api/rubrics.html
 # https://canvasapi.readthedocs.io/en/stable/rubric-ref.html#canvasapi.rubric.Rubric
 # POST /api/v1/courses/:course_id/rubrics
-def create_rubric(course, inputdict): 
-    rubric = course.create_rubric(**inputdict)    
+def create_rubric(course, inputdict, dosleep=True): 
+    rubric = None
+    repeat = True
+    attempt = 0
+    
+    while repeat:
+        try:
+            with canvas_request_slots:
+                rubric = course.create_rubric(**inputdict)    
+            printlog("Create Rubric: Successful")
+            repeat = False
+        except (exceptions.Forbidden, exceptions.RateLimitExceeded):
+            print("Creating Rubric: Forbidden - it is possible that the rate limit is exceeded")
+            repeat = True
+        except exceptions.ResourceDoesNotExist:
+            print("Creating Rubric: Resource Does Not Exist")
+            repeat = False
+        except exceptions.Unauthorized:
+            print("Creating Rubric: Unauthorized")
+            repeat = False
+        except exceptions.BadRequest as ex:
+            print("Creating Rubric: Bad Request - " + repr(ex))
+            repeat = False
+        except exceptions.CanvasException as ex: # any other refusal will not succeed on a retry either
+            print("Creating Rubric: Canvas Error - " + repr(ex))
+            repeat = False
+        except Exception as ex:
+            print("Creating Rubric: Unknown Error - " + repr(ex))
+            repeat = False
+            
+        if repeat:
+            attempt = attempt + 1
+            if attempt >= RATE_LIMIT_MAX_ATTEMPTS: # this runs on a child thread, so never retry forever or the final join would hang
+                print("Creating Rubric: giving up on " + inputdict['rubric']['title'])
+                repeat = False
+            elif dosleep: # for rate limiting, only wait once Canvas has refused the request
+                ratelimitsleep(attempt - 1)
+            
     return rubric
     
 # Create Assignment Group: https://canvas.instructure.com/doc/api/assignment_groups.html#method.assignment_groups_api.create
@@ -531,10 +620,10 @@ def add_assignments_to_groups(course, postdict):
     posidx = {}
     
     # Get all the assignments
-    assignments = course.get_assignments()
+    assignments = course.get_assignments(per_page=CANVAS_PAGE_SIZE)
     
     # Get all the assignment groups
-    groups = course.get_assignment_groups()
+    groups = course.get_assignment_groups(per_page=CANVAS_PAGE_SIZE)
     
     # If the assignment is already in the quiz group due to an import, don't move it
     quizgroup = get_assignment_group_containing_label(groups, 'Quiz') 
@@ -585,7 +674,7 @@ def add_assignments_to_groups(course, postdict):
     
     # Add quizzes to the Quiz group    
     if not (quizgroup is None):
-        quizzes = course.get_quizzes()
+        quizzes = course.get_quizzes(per_page=CANVAS_PAGE_SIZE)
         
         for quiz in quizzes:
             inputdict = {}
@@ -627,6 +716,7 @@ def process_markdown(fname, canvas, course, courseid, homepage):
 
     # offset the course end date by the same amount as assignments so that assignments can be due just past midnight if the grace period allows it; preserve the date string format so we can manipulate it consistently later
     enddate = getDateString(adddays(parseDate(enddate), DUE_DATE_OFFSET), fmt='%Y/%m/%d')
+    lockat = parseDateTimeCanvas(parseDate(enddate.replace('/', '') + get_local_time(enddate), DUE_DATE_FORMAT)) # assignments and quizzes all lock out on the last day of the class
     
     isM = postdict['info']['class_meets_days']['isM']
     isT = postdict['info']['class_meets_days']['isT']
@@ -636,6 +726,10 @@ def process_markdown(fname, canvas, course, courseid, homepage):
     isS = postdict['info']['class_meets_days']['isS']
     isU = postdict['info']['class_meets_days']['isU']
     
+    meetingdays = getMeetingDays(isM, isT, isW, isR, isF, isS, isU)
+    homepagebase = addslash(homepage) # relative activity, deliverable and reading links are all resolved against this
+    startdt = parseDate(startdate)
+    
     late_penalty_per_period = float(postdict['info']['late_penalty_per_period'])
     late_penalty_period = postdict['info']['late_penalty_period']
     
@@ -696,8 +790,7 @@ def process_markdown(fname, canvas, course, courseid, homepage):
             day = meeting['day']
             daynum = getDayCodeNum(meeting['day'])
             
-            dt = parseDate(startdate)
-            dt = adddays(dt, daynum)
+            dt = adddays(startdt, daynum)
             
             dtstart = getDateString(dt)
             dtstart = dtstart + "T"
@@ -723,7 +816,7 @@ def process_markdown(fname, canvas, course, courseid, homepage):
                 inputdict['all_day'] = False
                 inputdict['duplicate'] = {}
                 inputdict['duplicate']['frequency'] = "weekly"
-                inputdict['duplicate']['count'] = countWeeks(parseDate(startdate), parseDate(enddate))
+                inputdict['duplicate']['count'] = countWeeks(startdt, parseDate(enddate))
             
                 create_calendar_event(canvas, inputdict)
 
@@ -741,8 +834,8 @@ def process_markdown(fname, canvas, course, courseid, homepage):
         else:
             link = ""
    
-        startd = getCourseDate(startdate, weekidx, dayidx, isM, isT, isW, isR, isF, isS, isU)
-        coursedt = getCourseDate(startdate, weekidx, dayidx, isM, isT, isW, isR, isF, isS, isU, tostring=False)
+        coursedt = getCourseDateFromMeetingDays(startdt, weekidx, dayidx, meetingdays, tostring=False) # shared by this item's deliverables below
+        startd = getDateString(coursedt)
         coursedtstr = coursedt.strftime('%a, %b %d, %Y')
         if 'reschedule' in item:
             coursedtstr = item['reschedule']
@@ -801,7 +894,7 @@ def process_markdown(fname, canvas, course, courseid, homepage):
             inputdict = {}
             inputdict['title'] = "Activity: " + title
             inputdict['type'] = "ExternalUrl"
-            inputdict['external_url'] = makelink(addslash(homepage), stripnobool(link))
+            inputdict['external_url'] = makelink(homepagebase, stripnobool(link))
             inputdict['new_tab'] = True
             inputdict['published'] = True
             add_module_item(module, inputdict)
@@ -809,10 +902,9 @@ def process_markdown(fname, canvas, course, courseid, homepage):
         if 'deliverables' in item:
             for deliverable in item['deliverables']:        
                 dtitle = deliverable['dtitle']
-                if 'dlink' in deliverable and len(str(deliverable['dlink']).strip()) > 0 and str(deliverable['dlink']).strip().lower() != "false":
-                    dlink = deliverable['dlink']
-                else:
-                    dlink = None
+                dlink = getlink(deliverable, 'dlink')
+                if not (dlink is None):
+                    dlinkurl = makelink(homepagebase, dlink)
                     
                 if 'points' in deliverable:
                     points = int(deliverable['points'])
@@ -820,13 +912,13 @@ def process_markdown(fname, canvas, course, courseid, homepage):
                     points = 100                    
                 
                 description = dtitle.strip() 
+                descriptionlower = description.lower()
 
                 # Create an Assignment Shell
-                if (not (' handed out' in description.lower()) and not ('quiz:' in description.lower())):
+                if (not (' handed out' in descriptionlower) and not ('quiz:' in descriptionlower)):
                     description = rchop(description, " Due")
                     
-                    duedate = getCourseDate(startdate, weekidx, dayidx, isM, isT, isW, isR, isF, isS, isU, tostring=False)
-                    duedate = getDateString(adddays(duedate, DUE_DATE_OFFSET)) # offset the due date as needed for the due time which is in UTC
+                    duedate = getDateString(adddays(coursedt, DUE_DATE_OFFSET)) # offset the due date as needed for the due time which is in UTC
                     
                     inputdict = {}
                     inputdict['name'] = description
@@ -857,10 +949,10 @@ def process_markdown(fname, canvas, course, courseid, homepage):
                     if dlink is None:
                         inputdict['description'] = description 
                     else:
-                        inputdict['description'] = description + " (<a href=\"" + makelink(addslash(homepage), stripnobool(dlink)) + "\">" + makelink(addslash(homepage), stripnobool(dlink)) + "</a>)"
+                        inputdict['description'] = description + " (<a href=\"" + dlinkurl + "\">" + dlinkurl + "</a>)"
                         
-                    inputdict['due_at'] = parseDateTimeCanvas(datetime.strptime(duedate + get_local_time(duedate), DUE_DATE_FORMAT)) 
-                    inputdict['lock_at'] = parseDateTimeCanvas(datetime.strptime(enddate.replace('/', '') + get_local_time(enddate), DUE_DATE_FORMAT)) # lock out assignments on the last day of the class
+                    inputdict['due_at'] = parseDateTimeCanvas(parseDate(duedate + get_local_time(duedate), DUE_DATE_FORMAT)) 
+                    inputdict['lock_at'] = lockat # lock out assignments on the last day of the class
                     inputdict['position'] = asmtidx
                     
                     printlog("Adding Assignment: " + description + " due at: " + str(duedate))
@@ -870,75 +962,53 @@ def process_markdown(fname, canvas, course, courseid, homepage):
                     
                     assignmentid = assignment.id
                     
-                    # Create a Rubric for this Assignment if Specified
+                    # Create a Rubric for this Assignment if Specified; check for the file first so a missing rubric is reported instead of failing the run
                     if "rubricpath" in deliverable:
-                        inputdict = {}
-                        
                         rubricpath = deliverable['rubricpath']
-                        printlog("Adding Rubric from " + rubricpath)
-                        rubricf = open(rubricpath, 'r')
-                        rubricmdcontents = rubricf.read()
-                        rubricpost = frontmatter.loads(rubricmdcontents)
-                        rubricpostdict = rubricpost.to_dict()  
-                        if "info" in rubricpostdict and "rubric" in rubricpostdict['info']:
-                            rubric = rubricpostdict['info']['rubric']                        
-                            
-                            inputdict['rubric_association_id'] = assignmentid
+                        if not os.path.exists(rubricpath):
+                            print("Warning: rubric file " + rubricpath + " not found for " + description + "; skipping its rubric.")
+                        else:
+                            inputdict = {}
+                            printlog("Adding Rubric from " + rubricpath)
+                            rubric = load_rubric_criteria(rubricpath, os.path.getmtime(rubricpath))
+                            if not (rubric is None):
+                                inputdict['rubric_association_id'] = assignmentid
                             
-                            inputdict['rubric'] = {}
-                            inputdict['rubric']['title'] = description + " Rubric"
-                            inputdict['rubric']['points_possible'] = points
-                            inputdict['rubric']['free_form_criterion_comments'] = False
-                            inputdict['rubric']['skip_updating_points_possible'] = False
-                            inputdict['rubric']['read_only'] = False
-                            inputdict['rubric']['reusable'] = True
-                            inputdict['rubric']['criteria'] = {}
+                                inputdict['rubric'] = {}
+                                inputdict['rubric']['title'] = description + " Rubric"
+                                inputdict['rubric']['points_possible'] = points
+                                inputdict['rubric']['free_form_criterion_comments'] = False
+                                inputdict['rubric']['skip_updating_points_possible'] = False
+                                inputdict['rubric']['read_only'] = False
+                                inputdict['rubric']['reusable'] = True
+                                inputdict['rubric']['criteria'] = {}
                             
-                            inputdict['rubric_association'] = {}
-                            inputdict['rubric_association']['use_for_grading'] = True
-                            inputdict['rubric_association']['purpose'] = "grading"
-                            inputdict['rubric_association']['association_id'] = assignmentid
-                            inputdict['rubric_association']['association_type'] = "Assignment"
-                            inputdict['rubric_association']['bookmarked'] = True
+                                inputdict['rubric_association'] = {}
+                                inputdict['rubric_association']['use_for_grading'] = True
+                                inputdict['rubric_association']['purpose'] = "grading"
+                                inputdict['rubric_association']['association_id'] = assignmentid
+                                inputdict['rubric_association']['association_type'] = "Assignment"
+                                inputdict['rubric_association']['bookmarked'] = True
                             
-                            criteriaidx = 0
-                            for criteria in rubric:
-                                criteriadict = {}
-                                criteriadict['description'] = criteria['description']
-                                criteriadict['long_description'] = criteria['description']
-                                criteriadict['criterion_use_range'] = True
-                                criteriapoints = (points * float(criteria['weight']) / 100)
-                                criteriadict['points'] = criteriapoints
-                                criteriadict['ratings'] = {}
-                                
-                                ratingdict = {}
-                                ratingdict['description'] = "Pre-Emerging"
-                                ratingdict['long_description'] = criteria['preemerging']
-                                ratingdict['points'] = (criteriapoints * 0.25)
-                                criteriadict['ratings'][0] = ratingdict
-                                
-                                ratingdict = {}
-                                ratingdict['description'] = "Beginning"
-                                ratingdict['long_description'] = criteria['beginning']
-                                ratingdict['points'] = (criteriapoints * 0.50)
-                                criteriadict['ratings'][1] = ratingdict
+                                criteriaidx = 0
+                                for (criteriadescription, criteriaweight, ratingdescriptions) in rubric:
+                                    criteriadict = {}
+                                    criteriadict['description'] = criteriadescription
+                                    criteriadict['long_description'] = criteriadescription
+                                    criteriadict['criterion_use_range'] = True
+                                    criteriapoints = (points * criteriaweight / 100)
+                                    criteriadict['points'] = criteriapoints
+                                    criteriadict['ratings'] = {i: {'description': ratingname, 'long_description': ratingdescriptions[i], 'points': (criteriapoints * ratingweight)} for i, (ratingname, ratingkey, ratingweight) in enumerate(RUBRIC_RATINGS)}
                                 
-                                ratingdict = {}
-                                ratingdict['description'] = "Progressing"
-                                ratingdict['long_description'] = criteria['progressing']
-                                ratingdict['points'] = (criteriapoints * 0.85)
-                                criteriadict['ratings'][2] = ratingdict
-                                
-                                ratingdict = {}
-                                ratingdict['description'] = "Proficient"
-                                ratingdict['long_description'] = criteria['proficient']
-                                ratingdict['points'] = (criteriapoints * 1.00)                              
-                                criteriadict['ratings'][3] = ratingdict
-                                
-                                inputdict['rubric']['criteria'][criteriaidx] = criteriadict
-                                criteriaidx = criteriaidx + 1
+                                    inputdict['rubric']['criteria'][criteriaidx] = criteriadict
+                                    criteriaidx = criteriaidx + 1
 
-                        create_rubric(course, inputdict)
+                                # the rubric only needs the assignment id, so create it in the background while the remaining deliverables are added
+                                t = threading.Thread(target=create_rubric, args=(course, inputdict,))
+                                child_threads.append(t)
+                                t.start()
+                            else:
+                                print("Warning: no rubric found in " + rubricpath + "; skipping its rubric.")
                     
                     # Create a Module Entry for the Assignment
                     inputdict = {}
@@ -947,7 +1017,7 @@ def process_markdown(fname, canvas, course, courseid, homepage):
                     inputdict['content_id'] = assignmentid
                     inputdict['published'] = True
                     add_module_item(module, inputdict)
-                elif ('quiz:' in description.lower()):
+                elif ('quiz:' in descriptionlower):
                     if 'qtizippath' in deliverable:
                         # upload the quiz automatically
                         quiz_path = deliverable['qtizippath']
@@ -962,20 +1032,19 @@ def process_markdown(fname, canvas, course, courseid, homepage):
                     quiz_name = lchop(description, "Quiz: ")
                     quiz = find_quiz_by_title(course, quiz_name)
                     if not (quiz is None):
-                        duedate = getCourseDate(startdate, weekidx, dayidx, isM, isT, isW, isR, isF, isS, isU, tostring=False)
-                        duedate = adddays(duedate, DUE_DATE_OFFSET) # offset the due date as needed for the due time which is in UTC
+                        duedate = adddays(coursedt, DUE_DATE_OFFSET) # offset the due date as needed for the due time which is in UTC
                         opendate = adddays(duedate, -2) # unlock the quiz 2 days before
                         duedate = getDateString(duedate)
                         opendate = getDateString(opendate)
                         
                         inputdict = {}
                         inputdict['quiz_type'] = "assignment"
-                        inputdict['unlock_at'] = parseDateTimeCanvas(datetime.strptime(opendate + get_local_time(opendate), DUE_DATE_FORMAT))
-                        inputdict['due_at'] = parseDateTimeCanvas(datetime.strptime(duedate + get_local_time(duedate), DUE_DATE_FORMAT)) 
-                        inputdict['lock_at'] = parseDateTimeCanvas(datetime.strptime(enddate.replace('/', '') + get_local_time(enddate), DUE_DATE_FORMAT)) # lock out assignments on the last day of the class
+                        inputdict['unlock_at'] = parseDateTimeCanvas(parseDate(opendate + get_local_time(opendate), DUE_DATE_FORMAT))
+                        inputdict['due_at'] = parseDateTimeCanvas(parseDate(duedate + get_local_time(duedate), DUE_DATE_FORMAT)) 
+                        inputdict['lock_at'] = lockat # lock out assignments on the last day of the class
                         inputdict['show_correct_answers'] = True
                         inputdict['published'] = True
-                        inputdict['show_correct_answers_at'] = parseDateTimeCanvas(datetime.strptime(duedate + get_local_time(duedate), DUE_DATE_FORMAT)) # show quiz results after the deadline
+                        inputdict['show_correct_answers_at'] = parseDateTimeCanvas(parseDate(duedate + get_local_time(duedate), DUE_DATE_FORMAT)) # show quiz results after the deadline
                         
                         quiz = edit_quiz(quiz, inputdict) # we'll move the quiz if needed into the right assignment group with other assignments, once the groups are created 
                     else:
@@ -988,7 +1057,7 @@ def process_markdown(fname, canvas, course, courseid, homepage):
                         inputdict['type'] = "SubHeader"
                     else:
                         inputdict['type'] = "ExternalUrl"
-                        inputdict['external_url'] = makelink(addslash(homepage), stripnobool(dlink))
+                        inputdict['external_url'] = dlinkurl
                         inputdict['new_tab'] = True            
                     inputdict['published'] = True
                     add_module_item(module, inputdict)  
@@ -996,10 +1065,7 @@ def process_markdown(fname, canvas, course, courseid, homepage):
         if 'readings' in item:
             for reading in item['readings']:    
                 rtitle = reading['rtitle']
-                if 'rlink' in reading and len(str(reading['rlink']).strip()) > 0 and str(reading['rlink']).strip().lower() != "false":
-                    rlink = reading['rlink']
-                else:
-                    rlink = None  
+                rlink = getlink(reading, 'rlink')
                 
                 # Create a Module Entry for the Reading Activity
                 inputdict = {}
@@ -1009,7 +1075,7 @@ def process_markdown(fname, canvas, course, courseid, homepage):
                     inputdict['type'] = "SubHeader"
                 else:
                     inputdict['type'] = "ExternalUrl"
-                    inputdict['external_url'] = makelink(addslash(homepage), stripnobool(rlink))
+                    inputdict['external_url'] = makelink(homepagebase, rlink)
                     inputdict['new_tab'] = True            
                 
                 add_module_item(module, inputdict)                  
@@ -1062,7 +1128,7 @@ def process_markdown(fname, canvas, course, courseid, homepage):
                 inputdict['all_day'] = False
                 inputdict['duplicate'] = {}
                 inputdict['duplicate']['frequency'] = "weekly"
-                inputdict['duplicate']['count'] = countWeeks(parseDate(startdate), parseDate(enddate))
+                inputdict['duplicate']['count'] = countWeeks(startdt, parseDate(enddate))
                 
                 create_calendar_event(canvas, inputdict)  
 
@@ -1140,11 +1206,10 @@ def process_markdown(fname, canvas, course, courseid, homepage):
         add_assignments_to_groups(course, postdict)
         
         # Delete the default Assignments and Imported Assignments gradebook groups; don't use these on syllabi
-        delete_assignment_group_by_name(course, "Assignments")        
-        delete_assignment_group_by_name(course, "Imported Assignments")         
+        delete_assignment_groups_by_name(course, ["Assignments", "Imported Assignments"])
 
 def get_courseid(canvas, user):
-    courses = user.get_courses()
+    courses = user.get_courses(per_page=CANVAS_PAGE_SIZE)
     
     for course in courses:
         print(course)
@@ -1211,6 +1276,8 @@ for o, a in opts:
     elif o in ("-o", "--noofficehours"):
         skipofficehours = True        
 
+LOCALTIME = pytz.timezone(CANVAS_TIME_ZONE) # after option parsing so that --timezone takes effect
+
 if USER_ID is None:
     USER_ID = input("Enter User ID (get from API_URL + /api/v1/users/self): ")
 if API_KEY is None: